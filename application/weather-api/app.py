@@ -1,12 +1,24 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, g, has_request_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import logging
 import sys
 from datetime import datetime
 import random
 import os
+import time
+import threading
+import contextlib
+import hmac
+import gzip
 import requests
-from functools import lru_cache
+from collections import Counter, OrderedDict
+from functools import wraps
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; fall back to gzip only
+    brotli = None
 
 # Configure logging
 logging.basicConfig(
@@ -26,6 +38,585 @@ OPENWEATHER_API_KEY = os.environ.get('OPENWEATHER_API_KEY', '')
 OPENWEATHER_BASE_URL = 'https://api.openweathermap.org/data/2.5'
 USE_MOCK_DATA = os.environ.get('USE_MOCK_DATA', 'false').lower() == 'true'
 
+# Tracing / profiling configuration (both disabled by default)
+TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'false').lower() == 'true'
+PROFILE_MODE = os.environ.get('PROFILE_MODE', 'off').lower()  # off | header | all
+PROFILE_HEADER = 'X-Profile'
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')  # header mode is off unless set
+PROFILE_MAX_PER_PROCESS = int(os.environ.get('PROFILE_MAX_PER_PROCESS', '20'))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', '/tmp/profiles')
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '5'))
+
+# Concurrency limits and load shedding (limits are per worker process, 0 = unlimited)
+MAX_IN_FLIGHT = int(os.environ.get('MAX_IN_FLIGHT', '0'))
+ROUTE_CONCURRENCY_LIMITS = os.environ.get('ROUTE_CONCURRENCY_LIMITS', '')  # e.g. "forecast=8,current=8"
+QUEUE_TIMEOUT_MS = float(os.environ.get('QUEUE_TIMEOUT_MS', '50'))
+SHED_RETRY_AFTER = int(os.environ.get('SHED_RETRY_AFTER', '1'))
+PRESSURE_RATIO = float(os.environ.get('PRESSURE_RATIO', '0.75'))
+SERVE_STALE_UNDER_PRESSURE = os.environ.get('SERVE_STALE_UNDER_PRESSURE', 'true').lower() == 'true'
+
+# Upstream results are reused for this long; older entries are only served under pressure
+CACHE_TTL_SECONDS = float(os.environ.get('CACHE_TTL_SECONDS', '600'))
+
+# Response compression and compact payloads
+# Off by default: API Gateway REST APIs without binary_media_types treat
+# application/json as text and corrupt gzip/br bodies on the way through.
+# The Helm chart enables it alongside the gateway's binary_media_types.
+COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'false').lower() == 'true'
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', '256'))
+ENCODED_BODY_CACHE_SIZE = int(os.environ.get('ENCODED_BODY_CACHE_SIZE', '512'))
+
+# Request tracing and profiling
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class Span:
+    """
+    Timed section of a request, reported in the Server-Timing header
+    """
+    __slots__ = ('name', 'desc', 'start', 'duration_ms')
+
+    def __init__(self, name, desc=None):
+        self.name = name
+        self.desc = desc
+        self.start = 0.0
+        self.duration_ms = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ms = (time.perf_counter() - self.start) * 1000
+        spans = g.get('trace_spans')
+        if spans is not None:
+            spans.append(self)
+        return False
+
+
+def trace_span(name, desc=None):
+    """
+    Return a span context manager, or a shared no-op when tracing is disabled
+    """
+    if not TRACING_ENABLED or not has_request_context():
+        return _NULL_SPAN
+    return Span(name, desc)
+
+
+def traced(func):
+    """
+    Record the wrapped route handler as a 'handler' span
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with trace_span('handler', func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries go stale after ttl seconds
+
+    Stale entries are kept (until evicted) so they can still be served when
+    the app is under pressure instead of calling upstream again.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key):
+        """
+        Return (value, fresh), or (_MISSING, False) if the key was never stored
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING, False
+            self._entries.move_to_end(key)
+        value, stored_at = entry
+        return value, time.monotonic() - stored_at < self.ttl
+
+    def store(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def ttl_cache(maxsize):
+    """
+    Attach a TTLCache to an upstream fetcher; lookups go through cached_fetch()
+    """
+    def decorator(func):
+        func.cache = TTLCache(maxsize, CACHE_TTL_SECONDS)
+        return func
+    return decorator
+
+
+def cached_fetch(func, *args):
+    """
+    Call a ttl_cache'd fetcher inside a 'cache' span tagged hit, miss or stale
+
+    Under load, an expired entry is returned instead of risking a new
+    upstream call (see under_pressure()).
+    """
+    with trace_span('cache') as span:
+        result, fresh = func.cache.lookup(args)
+        if fresh:
+            state = 'hit'
+        elif result is not _MISSING and SERVE_STALE_UNDER_PRESSURE and under_pressure():
+            state = 'stale'
+            stale_served.increment()
+        else:
+            state = 'miss'
+            result = func(*args)
+            func.cache.store(args, result)
+        if span is not None:
+            span.desc = state
+    return result
+
+
+def format_server_timing(spans):
+    """
+    Build a Server-Timing header value from recorded spans
+    """
+    entries = []
+    for span in spans:
+        entry = span.name
+        if span.desc:
+            entry += f';desc="{span.desc}"'
+        entries.append(f'{entry};dur={span.duration_ms:.2f}')
+    return ', '.join(entries)
+
+
+class TracedJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that records response encoding as a 'serialize' span
+    """
+
+    def dumps(self, obj, **kwargs):
+        with trace_span('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+class StackSampler:
+    """
+    Sampling profiler for a single request thread
+
+    Collects stacks in folded format (one 'frame;frame;frame count' line per
+    unique stack), which flamegraph.pl and speedscope can render directly.
+    """
+
+    def __init__(self, thread_id, interval_ms):
+        self.thread_id = thread_id
+        self.interval = interval_ms / 1000
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.items():
+                f.write(f"{stack} {count}\n")
+
+
+_profiles_lock = threading.Lock()
+_profiles_started = 0
+
+if PROFILE_MODE == 'header' and not PROFILE_TOKEN:
+    logger.warning("PROFILE_MODE=header but PROFILE_TOKEN is not set; profiling disabled")
+
+
+def should_profile():
+    """
+    Check whether the current request should be profiled
+
+    Header mode requires the X-Profile value to match PROFILE_TOKEN, and each
+    worker process writes at most PROFILE_MAX_PER_PROCESS profiles.
+    """
+    global _profiles_started
+
+    if PROFILE_MODE == 'header':
+        supplied = request.headers.get(PROFILE_HEADER, '')
+        if not PROFILE_TOKEN or not supplied or not hmac.compare_digest(supplied, PROFILE_TOKEN):
+            return False
+    elif PROFILE_MODE != 'all':
+        return False
+
+    with _profiles_lock:
+        if _profiles_started >= PROFILE_MAX_PER_PROCESS:
+            return False
+        _profiles_started += 1
+    return True
+
+
+@app.before_request
+def start_request_trace():
+    if TRACING_ENABLED:
+        g.trace_start = time.perf_counter()
+        g.trace_spans = []
+    if PROFILE_MODE != 'off' and should_profile():
+        g.profiler = StackSampler(threading.get_ident(), PROFILE_INTERVAL_MS)
+        g.profiler.start()
+
+
+@app.after_request
+def add_server_timing(response):
+    if TRACING_ENABLED and 'trace_start' in g:
+        total = Span('total')
+        total.duration_ms = (time.perf_counter() - g.trace_start) * 1000
+        header = format_server_timing(g.trace_spans + [total])
+        response.headers['Server-Timing'] = header
+        logger.info(f"Trace {request.method} {request.path} {response.status_code}: {header}")
+    return response
+
+
+@app.teardown_request
+def dump_request_profile(exc):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return
+
+    profiler.stop()
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = (request.endpoint or 'unknown').replace('/', '_')
+        path = os.path.join(PROFILE_DIR, f"{int(time.time() * 1000)}-{name}-{threading.get_ident()}.folded")
+        profiler.dump(path)
+        logger.info(f"Wrote request profile to {path}")
+    except OSError as e:
+        logger.error(f"Failed to write request profile: {str(e)}")
+
+
+app.json = TracedJSONProvider(app)
+
+
+# Concurrency limits and load shedding
+
+# Probes and metrics must keep answering while the app is saturated
+SHED_EXEMPT_PATHS = {'/health', '/ready', '/startup', '/metrics'}
+
+class MetricCounter:
+    """
+    Thread-safe monotonically increasing counter
+    """
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def increment(self):
+        with self._lock:
+            self.value += 1
+
+
+class ConcurrencyLimiter:
+    """
+    Bounded in-flight counter with a short wait queue
+
+    Tracks in-flight and queued requests even when unlimited (limit=0), so
+    the saturation signals are always available on /metrics.
+    """
+
+    def __init__(self, name, limit=0):
+        self.name = name
+        self.limit = limit
+        self.in_flight = 0
+        self.queued = 0
+        self.shed = 0
+        self._cond = threading.Condition()
+
+    def _has_capacity(self):
+        return not self.limit or self.in_flight < self.limit
+
+    def acquire(self, timeout):
+        """
+        Take a slot, waiting up to timeout seconds. Returns False if shed.
+        """
+        with self._cond:
+            if not self._has_capacity():
+                self.queued += 1
+                try:
+                    self._cond.wait_for(self._has_capacity, timeout)
+                finally:
+                    self.queued -= 1
+                if not self._has_capacity():
+                    self.shed += 1
+                    return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    @property
+    def under_pressure(self):
+        return bool(self.limit) and (self.queued > 0 or self.in_flight >= self.limit * PRESSURE_RATIO)
+
+
+def parse_route_limits(spec):
+    """
+    Parse "forecast=8,current=8" into {'/forecast': 8, '/current': 8}
+    """
+    limits = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        route, _, limit = item.partition('=')
+        limits['/' + route.strip().strip('/')] = int(limit)
+    return limits
+
+
+global_limiter = ConcurrencyLimiter('global', MAX_IN_FLIGHT)
+route_limiters = {
+    route: ConcurrencyLimiter(route, limit)
+    for route, limit in parse_route_limits(ROUTE_CONCURRENCY_LIMITS).items()
+}
+stale_served = MetricCounter()
+
+
+def under_pressure():
+    """
+    Check whether any limiter is close to saturation
+    """
+    return global_limiter.under_pressure or any(
+        limiter.under_pressure for limiter in route_limiters.values()
+    )
+
+
+@app.before_request
+def admit_request():
+    if request.path in SHED_EXEMPT_PATHS:
+        return None
+
+    timeout = QUEUE_TIMEOUT_MS / 1000
+    acquired = []
+    for limiter in (global_limiter, route_limiters.get(request.path)):
+        if limiter is None:
+            continue
+        if not limiter.acquire(timeout):
+            for held in acquired:
+                held.release()
+            # Debug only: a log line per shed request would flood logs under overload;
+            # weather_api_shed_requests_total on /metrics counts these
+            logger.debug(f"Shedding request to {request.path}: {limiter.name} limit {limiter.limit} reached")
+            return jsonify({
+                'error': 'Service overloaded',
+                'message': 'Too many concurrent requests, retry later'
+            }), 503, {'Retry-After': str(SHED_RETRY_AFTER)}
+        acquired.append(limiter)
+    g.limiters = acquired
+    return None
+
+
+@app.teardown_request
+def release_request_slots(exc):
+    for limiter in g.pop('limiters', ()):
+        limiter.release()
+
+
+# Response compression and compact payloads
+
+# Preferred first; br only when the optional Brotli package is installed
+SUPPORTED_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+CURRENT_FIELDS = ('temperature', 'condition', 'description', 'humidity', 'wind_speed', 'pressure', 'feels_like')
+FORECAST_FIELDS = ('day', 'high', 'low', 'condition')
+
+
+def negotiate_encoding():
+    """
+    Pick the supported content coding with the highest q-value from the
+    Accept-Encoding header, preferring br over gzip on ties
+    """
+    accepted = {}
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        name, _, params = part.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+
+    best, best_q = 'identity', 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress_body(body, encoding, best=False):
+    """
+    Compress a body; best=True trades CPU for size on bodies that are reused
+    """
+    if encoding == 'br':
+        return brotli.compress(body, quality=11 if best else 5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=9 if best else 6, mtime=0)
+    return body
+
+
+class EncodedBodyCache:
+    """
+    LRU of serialized response bodies with their compressed variants
+
+    An entry is reused only while the data it was rendered from is unchanged,
+    so each distinct cache entry is serialized once. A variant is first
+    compressed at the fast level and upgraded to the best level only when the
+    entry is actually reused, so data that changes on every request (e.g.
+    random mock data) never pays for maximum compression.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, data, render, encoding, sort_keys=True):
+        """
+        Return (body, encoding) for data, calling render() for the payload
+        only when no entry for this data exists yet
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == data:
+                self._entries.move_to_end(key)
+            else:
+                entry = None
+
+        reused = entry is not None
+        if not reused:
+            body = app.json.dumps(render(), separators=(',', ':'), sort_keys=sort_keys).encode('utf-8')
+            entry = (data, {'identity': body}, set())
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        _, bodies, best = entry
+        if len(bodies['identity']) < COMPRESS_MIN_BYTES:
+            encoding = 'identity'
+        if encoding != 'identity' and (encoding not in bodies or (reused and encoding not in best)):
+            with trace_span('compress', encoding):
+                bodies[encoding] = compress_body(bodies['identity'], encoding, best=reused)
+            if reused:
+                best.add(encoding)
+        return bodies[encoding], encoding
+
+
+encoded_bodies = EncodedBodyCache(ENCODED_BODY_CACHE_SIZE)
+
+
+def response_format():
+    """
+    Return the requested payload format: 'full' (default), 'stable' or 'compact'
+
+    'stable' has the same shape as 'full', but its timestamp is the time the
+    data was first served, so the body can be cached and pre-compressed.
+    """
+    fmt = request.args.get('format', '').lower()
+    return fmt if fmt in ('stable', 'compact') else 'full'
+
+
+def parse_fields(allowed):
+    """
+    Return the requested fields in canonical order (the order of allowed)
+
+    Raises:
+        ValueError if an unknown field is requested or the list selects nothing
+    """
+    spec = request.args.get('fields')
+    if spec is None:
+        return allowed
+
+    requested = {field.strip() for field in spec.split(',') if field.strip()}
+    if not requested:
+        raise ValueError("No fields selected")
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in allowed if field in requested)
+
+
+def cached_response(key, data, render, sort_keys=True):
+    """
+    Build a JSON response from the encoded body cache, reusing pre-compressed bodies
+
+    sort_keys=False keeps the payload's own key order (compact field order).
+    """
+    encoding = negotiate_encoding() if COMPRESSION_ENABLED else 'identity'
+    body, encoding = encoded_bodies.get(key, data, render, encoding, sort_keys)
+
+    response = Response(body, status=200, mimetype='application/json')
+    if COMPRESSION_ENABLED:
+        response.vary.add('Accept-Encoding')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+@app.after_request
+def compress_response(response):
+    if (not COMPRESSION_ENABLED or response.direct_passthrough
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if (response.content_length or 0) < COMPRESS_MIN_BYTES:
+        return response
+
+    encoding = negotiate_encoding()
+    if encoding == 'identity':
+        return response
+
+    with trace_span('compress', encoding):
+        response.set_data(compress_body(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
 # City name mapping for OpenWeatherMap
 SUPPORTED_CITIES = {
     'New York': 'New York,US',
@@ -106,6 +697,7 @@ MOCK_WEATHER_DATA = {
 
 
 @app.route('/', methods=['GET'])
+@traced
 def index():
     """
     API information endpoint
@@ -119,7 +711,10 @@ def index():
             '/ready': 'Readiness check endpoint',
             '/current?location={city}': 'Get current weather',
             '/forecast?location={city}&days={1-7}': 'Get weather forecast',
-            '/cities': 'List available cities'
+            '/forecast?location={city}&format=stable': 'Forecast with cacheable, pre-compressed body',
+            '/forecast?location={city}&format=compact&fields={f1,f2}': 'Compact columnar forecast',
+            '/cities': 'List available cities',
+            '/metrics': 'Concurrency and load shedding metrics'
         },
         'external_api': 'OpenWeatherMap' if OPENWEATHER_API_KEY else 'Mock Data',
         'api_configured': bool(OPENWEATHER_API_KEY),
@@ -128,6 +723,7 @@ def index():
 
 
 @app.route('/health', methods=['GET'])
+@traced
 def health():
     """
     Health check endpoint for Kubernetes liveness probe
@@ -139,6 +735,7 @@ def health():
 
 
 @app.route('/ready', methods=['GET'])
+@traced
 def ready():
     """
     Readiness check endpoint for Kubernetes readiness probe
@@ -150,11 +747,12 @@ def ready():
     if OPENWEATHER_API_KEY and not USE_MOCK_DATA:
         try:
             # Quick health check to OpenWeatherMap
-            response = requests.get(
-                f"{OPENWEATHER_BASE_URL}/weather",
-                params={'q': 'London', 'appid': OPENWEATHER_API_KEY},
-                timeout=3
-            )
+            with trace_span('upstream', 'openweathermap'):
+                response = requests.get(
+                    f"{OPENWEATHER_BASE_URL}/weather",
+                    params={'q': 'London', 'appid': OPENWEATHER_API_KEY},
+                    timeout=3
+                )
             if response.status_code != 200:
                 ready = False
                 message = 'external API not accessible'
@@ -172,6 +770,7 @@ def ready():
 
 
 @app.route('/startup', methods=['GET'])
+@traced
 def startup():
     """
     Startup check endpoint for Kubernetes startup probe
@@ -183,10 +782,12 @@ def startup():
 
 
 @app.route('/current', methods=['GET'])
+@traced
 def get_current_weather():
     """
     Get current weather for a location from OpenWeatherMap API
-    Query params: location (required)
+    Query params: location (required), format=stable|compact (optional),
+    fields (optional, compact only)
     """
     location = request.args.get('location', '').title()
     
@@ -205,6 +806,16 @@ def get_current_weather():
             'available_locations': list(SUPPORTED_CITIES.keys())
         }), 404
     
+    fmt = response_format()
+    if fmt == 'compact':
+        try:
+            fields = parse_fields(CURRENT_FIELDS)
+        except ValueError as e:
+            logger.warning(f"Invalid fields parameter: {str(e)}")
+            return jsonify({
+                'error': f'Invalid fields parameter: {str(e)}'
+            }), 400
+    
     try:
         # Use mock data if configured or if API key not available
         if USE_MOCK_DATA or not OPENWEATHER_API_KEY:
@@ -212,7 +823,15 @@ def get_current_weather():
                 logger.warning("OpenWeatherMap API key not configured, using mock data")
             weather = get_mock_weather(location)
         else:
-            weather = fetch_current_weather(location)
+            weather = cached_fetch(fetch_current_weather, location)
+        
+        if fmt == 'compact':
+            # Fields missing from the data (e.g. pressure in mock mode) are null
+            logger.info(f"Returning compact weather data for {location}")
+            return cached_response((request.path, fmt, location, fields), weather, lambda: {
+                'location': location,
+                'current': {field: weather.get(field) for field in fields}
+            }, sort_keys=False)
         
         response = {
             'location': location,
@@ -222,6 +841,8 @@ def get_current_weather():
         }
         
         logger.info(f"Returning weather data for {location}")
+        if fmt == 'stable':
+            return cached_response((request.path, fmt, location), weather, lambda: response)
         return jsonify(response), 200
         
     except Exception as e:
@@ -233,10 +854,12 @@ def get_current_weather():
 
 
 @app.route('/forecast', methods=['GET'])
+@traced
 def get_forecast():
     """
     Get weather forecast for a location from OpenWeatherMap API
-    Query params: location (required), days (optional, default=3, max=7)
+    Query params: location (required), days (optional, default=3, max=7),
+    format=stable|compact (optional), fields (optional, compact only)
     """
     location = request.args.get('location', '').title()
     days = request.args.get('days', '3')
@@ -266,6 +889,16 @@ def get_forecast():
             'available_locations': list(SUPPORTED_CITIES.keys())
         }), 404
     
+    fmt = response_format()
+    if fmt == 'compact':
+        try:
+            fields = parse_fields(FORECAST_FIELDS)
+        except ValueError as e:
+            logger.warning(f"Invalid fields parameter: {str(e)}")
+            return jsonify({
+                'error': f'Invalid fields parameter: {str(e)}'
+            }), 400
+    
     try:
         # Use mock data if configured or if API key not available
         if USE_MOCK_DATA or not OPENWEATHER_API_KEY:
@@ -273,7 +906,16 @@ def get_forecast():
                 logger.warning("OpenWeatherMap API key not configured, using mock data")
             forecast = get_mock_forecast(location, days)
         else:
-            forecast = fetch_forecast(location, days)
+            forecast = cached_fetch(fetch_forecast, location, days)
+        
+        if fmt == 'compact':
+            # Columnar layout: one array per field instead of repeating keys per day
+            logger.info(f"Returning compact {len(forecast)}-day forecast for {location}")
+            return cached_response((request.path, fmt, location, days, fields), forecast, lambda: {
+                'location': location,
+                'days': len(forecast),
+                'forecast': {field: [day.get(field) for day in forecast] for field in fields}
+            }, sort_keys=False)
         
         response = {
             'location': location,
@@ -284,6 +926,8 @@ def get_forecast():
         }
         
         logger.info(f"Returning {len(forecast)}-day forecast for {location}")
+        if fmt == 'stable':
+            return cached_response((request.path, fmt, location, days), forecast, lambda: response)
         return jsonify(response), 200
         
     except Exception as e:
@@ -295,6 +939,7 @@ def get_forecast():
 
 
 @app.route('/cities', methods=['GET'])
+@traced
 def get_cities():
     """
     Get list of available cities
@@ -313,13 +958,37 @@ def get_cities():
     return jsonify(response), 200
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Saturation metrics in Prometheus text format (per worker process)
+    """
+    limiters = [global_limiter] + list(route_limiters.values())
+    lines = []
+    for metric, kind, attr in (
+        ('weather_api_in_flight_requests', 'gauge', 'in_flight'),
+        ('weather_api_queued_requests', 'gauge', 'queued'),
+        ('weather_api_concurrency_limit', 'gauge', 'limit'),
+        ('weather_api_shed_requests_total', 'counter', 'shed'),
+    ):
+        lines.append(f"# TYPE {metric} {kind}")
+        for limiter in limiters:
+            lines.append(f'{metric}{{limiter="{limiter.name}"}} {getattr(limiter, attr)}')
+    lines.append("# TYPE weather_api_stale_responses_total counter")
+    lines.append(f"weather_api_stale_responses_total {stale_served.value}")
+    lines.append("# TYPE weather_api_under_pressure gauge")
+    lines.append(f"weather_api_under_pressure {int(under_pressure())}")
+
+    return '\n'.join(lines) + '\n', 200, {'Content-Type': 'text/plain; version=0.0.4'}
+
+
 # Helper functions for OpenWeatherMap API integration
 
-@lru_cache(maxsize=100)
+@ttl_cache(maxsize=100)
 def fetch_current_weather(city):
     """
     Fetch current weather from OpenWeatherMap API
-    Results are cached for performance
+    Results are cached for CACHE_TTL_SECONDS via cached_fetch()
     """
     city_query = SUPPORTED_CITIES.get(city, city)
     
@@ -331,10 +1000,10 @@ def fetch_current_weather(city):
     }
     
     logger.info(f"Fetching current weather from OpenWeatherMap for {city}")
-    response = requests.get(url, params=params, timeout=10)
-    response.raise_for_status()
-    
-    data = response.json()
+    with trace_span('upstream', 'openweathermap'):
+        response = requests.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        data = response.json()
     
     return {
         'temperature': round(data['main']['temp'], 1),
@@ -347,11 +1016,11 @@ def fetch_current_weather(city):
     }
 
 
-@lru_cache(maxsize=100)
+@ttl_cache(maxsize=100)
 def fetch_forecast(city, days=3):
     """
     Fetch weather forecast from OpenWeatherMap API
-    Results are cached for performance
+    Results are cached for CACHE_TTL_SECONDS via cached_fetch()
     """
     city_query = SUPPORTED_CITIES.get(city, city)
     
@@ -364,10 +1033,10 @@ def fetch_forecast(city, days=3):
     }
     
     logger.info(f"Fetching {days}-day forecast from OpenWeatherMap for {city}")
-    response = requests.get(url, params=params, timeout=10)
-    response.raise_for_status()
-    
-    data = response.json()
+    with trace_span('upstream', 'openweathermap'):
+        response = requests.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        data = response.json()
     
     # Group forecasts by day
     daily_forecasts = []
@@ -0,0 +1,148 @@
+"""
+Local overload benchmark for the Weather API
+
+Runs the app in-process behind a threaded WSGI server with a simulated
+OpenWeatherMap upstream (requests.get patched with fixed latency and a
+bounded connection pool), then drives /forecast with an open-loop load above
+upstream capacity. The app's own cached fetch path is used, with a short
+cache TTL so entries keep expiring during the run. Each scenario reports
+goodput (successful responses within the SLO per second), shed requests and
+latency percentiles.
+
+Usage:
+    python benchmark_load.py [--rate 300] [--duration 5] [--slo-ms 500] [--ttl 0.25]
+"""
+import argparse
+import http.client
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import make_server
+
+import app as weather_app
+
+UPSTREAM_LATENCY_S = 0.05
+UPSTREAM_CONNECTIONS = 8
+CITIES = list(weather_app.SUPPORTED_CITIES.keys())
+
+_upstream_pool = threading.Semaphore(UPSTREAM_CONNECTIONS)
+
+
+class FakeUpstreamResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+def fake_upstream_get(url, params=None, timeout=None):
+    """
+    Stand-in for requests.get against OpenWeatherMap's /forecast endpoint
+    """
+    with _upstream_pool:
+        time.sleep(UPSTREAM_LATENCY_S)
+    start = int(time.time())
+    return FakeUpstreamResponse({'list': [
+        {'dt': start + i * 3 * 3600, 'main': {'temp': 60 + i % 10}, 'weather': [{'main': 'Clear'}]}
+        for i in range(params['cnt'])
+    ]})
+
+
+def configure(max_in_flight, route_limits, serve_stale):
+    weather_app.global_limiter = weather_app.ConcurrencyLimiter('global', max_in_flight)
+    weather_app.route_limiters = {
+        route: weather_app.ConcurrencyLimiter(route, limit)
+        for route, limit in weather_app.parse_route_limits(route_limits).items()
+    }
+    weather_app.SERVE_STALE_UNDER_PRESSURE = serve_stale
+    weather_app.fetch_forecast.cache.clear()
+
+
+def send(port, path):
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        conn.request('GET', path)
+        status = conn.getresponse().status
+    except OSError:
+        status = 0
+    finally:
+        conn.close()
+    return status, time.perf_counter() - start
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_scenario(name, port, rate, duration, slo_ms):
+    interval = 1 / rate
+    futures = []
+    with ThreadPoolExecutor(max_workers=512) as pool:
+        start = time.perf_counter()
+        for i in range(int(rate * duration)):
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            city = random.choice(CITIES).replace(' ', '%20')
+            futures.append(pool.submit(send, port, f'/forecast?location={city}&days={random.randint(1, 7)}'))
+        results = [f.result() for f in futures]
+
+    ok = [latency * 1000 for status, latency in results if status == 200]
+    shed = [latency * 1000 for status, latency in results if status == 503]
+    errors = sum(1 for status, _ in results if status not in (200, 503))
+    good = sum(1 for latency in ok if latency <= slo_ms)
+
+    print(f"{name:<28} sent={len(results):<5} ok={len(ok):<5} shed={len(shed):<5} errors={errors:<3} "
+          f"goodput={good / duration:7.1f}/s  ok p50={percentile(ok, 50):7.1f}ms "
+          f"p99={percentile(ok, 99):7.1f}ms  shed p99={percentile(shed, 99):6.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rate', type=float, default=300, help='offered requests per second')
+    parser.add_argument('--duration', type=float, default=5, help='seconds per scenario')
+    parser.add_argument('--slo-ms', type=float, default=500, help='latency SLO for goodput')
+    parser.add_argument('--ttl', type=float, default=0.25, help='forecast cache TTL in seconds')
+    args = parser.parse_args()
+
+    weather_app.requests.get = fake_upstream_get
+    weather_app.fetch_forecast.cache.ttl = args.ttl
+    weather_app.USE_MOCK_DATA = False
+    weather_app.OPENWEATHER_API_KEY = 'benchmark'
+    weather_app.logger.disabled = True
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    server = make_server('127.0.0.1', 0, weather_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    capacity = UPSTREAM_CONNECTIONS / UPSTREAM_LATENCY_S
+    print(f"Upstream capacity ~{capacity:.0f} req/s, offered {args.rate:.0f} req/s for {args.duration:.0f}s, "
+          f"cache TTL {args.ttl}s\n")
+
+    scenarios = [
+        ('no limits', 0, '', False),
+        ('shedding', 32, f'forecast={UPSTREAM_CONNECTIONS * 2}', False),
+        ('shedding + stale cache', 32, f'forecast={UPSTREAM_CONNECTIONS * 2}', True),
+    ]
+    for name, max_in_flight, route_limits, serve_stale in scenarios:
+        configure(max_in_flight, route_limits, serve_stale)
+        run_scenario(name, server.server_port, args.rate, args.duration, args.slo_ms)
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
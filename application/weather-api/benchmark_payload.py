@@ -0,0 +1,101 @@
+"""
+Payload size and CPU benchmark for the Weather API
+
+Polls /current and /forecast for every supported city the way a mobile
+client does, in full, stable and compact mode and with each content coding,
+and reports average bytes on the wire and server CPU time per request.
+requests.get is patched to return in-memory OpenWeatherMap fixtures, and
+results are served from the app's warm cache, so only the app's own work
+(routing, serialization, compression) is measured.
+
+Usage:
+    python benchmark_payload.py [--rounds 20] [--days 7]
+"""
+import argparse
+import logging
+import time
+
+import app as weather_app
+
+CITIES = list(weather_app.SUPPORTED_CITIES.keys())
+
+
+class FixtureResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+def fixture_get(url, params=None, timeout=None):
+    """
+    Stand-in for requests.get against OpenWeatherMap's /weather and /forecast
+    """
+    if url.endswith('/forecast'):
+        start = 1700000000
+        return FixtureResponse({'list': [
+            {'dt': start + i * 3 * 3600, 'main': {'temp': 55.5 + i % 8 * 2}, 'weather': [{'main': 'Clear'}]}
+            for i in range(params['cnt'])
+        ]})
+    return FixtureResponse({
+        'main': {'temp': 68.4, 'humidity': 61, 'pressure': 1014, 'feels_like': 67.9},
+        'weather': [{'main': 'Clouds', 'description': 'scattered clouds'}],
+        'wind': {'speed': 7.2}
+    })
+
+
+def run(client, label, paths, encoding, rounds):
+    headers = {'Accept-Encoding': encoding} if encoding != 'identity' else {}
+    total_bytes = 0
+    requests_made = 0
+    cpu_start = time.process_time()
+    for _ in range(rounds):
+        for path in paths:
+            response = client.get(path, headers=headers)
+            assert response.status_code == 200, (path, response.status_code)
+            total_bytes += len(response.data)
+            requests_made += 1
+    cpu_us = (time.process_time() - cpu_start) / requests_made * 1e6
+    print(f"{label:<26} {encoding:<9} {total_bytes / requests_made:8.0f} B/req {cpu_us:8.0f} us CPU/req")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rounds', type=int, default=20, help='polls of every city per scenario')
+    parser.add_argument('--days', type=int, default=7, help='forecast days requested')
+    args = parser.parse_args()
+
+    weather_app.requests.get = fixture_get
+    weather_app.USE_MOCK_DATA = False
+    weather_app.OPENWEATHER_API_KEY = 'benchmark'
+    weather_app.COMPRESSION_ENABLED = True
+    weather_app.logger.disabled = True
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    client = weather_app.app.test_client()
+    encodings = ['identity', 'gzip'] + (['br'] if weather_app.brotli is not None else [])
+
+    scenarios = []
+    for route, query in (('current', ''), ('forecast', f'&days={args.days}')):
+        base = [f'/{route}?location={city}{query}' for city in CITIES]
+        scenarios.append((f'{route} full', base))
+        scenarios.append((f'{route} stable', [f'{path}&format=stable' for path in base]))
+        scenarios.append((f'{route} compact', [f'{path}&format=compact' for path in base]))
+    scenarios.append(('forecast compact high,low', [
+        f'/forecast?location={city}&days={args.days}&format=compact&fields=high,low' for city in CITIES
+    ]))
+
+    print(f"{len(CITIES)} cities x {args.rounds} rounds per scenario\n")
+    for label, paths in scenarios:
+        for encoding in encodings:
+            run(client, label, paths, encoding, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
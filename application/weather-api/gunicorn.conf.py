@@ -0,0 +1,49 @@
+"""
+Gunicorn configuration for the Weather API
+
+Worker and thread counts are sized from the container's CPU quota instead
+of being hard-coded. The app is I/O-bound on upstream calls, so it runs few
+processes with many threads and relies on the in-app concurrency limits
+(MAX_IN_FLIGHT, ROUTE_CONCURRENCY_LIMITS) to shed load when saturated.
+"""
+import math
+import os
+
+
+def available_cpus():
+    """
+    Return the CPU quota from cgroups (v2, then v1), falling back to os.cpu_count()
+    """
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+
+    return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+workers = int(os.environ.get('WEB_CONCURRENCY', max(1, math.ceil(available_cpus()))))
+threads = int(os.environ.get('GUNICORN_THREADS', '16'))
+worker_class = 'gthread'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info')
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as weather_app  # noqa: E402
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    """
+    The app module in mock-data mode with fresh, unlimited limiters and empty caches
+    """
+    monkeypatch.setattr(weather_app, 'USE_MOCK_DATA', True)
+    monkeypatch.setattr(weather_app, 'global_limiter', weather_app.ConcurrencyLimiter('global', 0))
+    monkeypatch.setattr(weather_app, 'route_limiters', {})
+    weather_app.encoded_bodies._entries.clear()
+    weather_app.fetch_current_weather.cache.clear()
+    weather_app.fetch_forecast.cache.clear()
+    return weather_app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
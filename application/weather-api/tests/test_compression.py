@@ -0,0 +1,144 @@
+import gzip
+import json
+
+import pytest
+
+
+@pytest.fixture
+def compressing(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'COMPRESSION_ENABLED', True)
+    return app_module
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('', 'identity'),
+    ('gzip', 'gzip'),
+    ('gzip;q=0', 'identity'),
+    ('gzip;q=0, br;q=0', 'identity'),
+    ('gzip, br', 'br'),
+    ('gzip;q=1.0, br;q=0.5', 'gzip'),
+    ('*', 'br'),
+    ('*;q=0.5, gzip', 'gzip'),
+    ('*, br;q=0', 'gzip'),
+    ('gzip;q=oops, br;q=0.1', 'br'),
+    ('deflate, identity', 'identity'),
+])
+def test_negotiate_encoding(app_module, monkeypatch, header, expected):
+    monkeypatch.setattr(app_module, 'SUPPORTED_ENCODINGS', ('br', 'gzip'))
+    with app_module.app.test_request_context(headers={'Accept-Encoding': header}):
+        assert app_module.negotiate_encoding() == expected
+
+
+def test_negotiate_without_brotli_falls_back_to_gzip(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'SUPPORTED_ENCODINGS', ('gzip',))
+    with app_module.app.test_request_context(headers={'Accept-Encoding': 'br, gzip;q=0.1'}):
+        assert app_module.negotiate_encoding() == 'gzip'
+
+
+def test_full_response_is_compressed_with_vary(client, compressing):
+    response = client.get('/forecast?location=London&days=3', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.data))['location'] == 'London'
+
+
+def test_small_body_is_not_compressed(client, compressing):
+    response = client.get('/health', headers={'Accept-Encoding': 'gzip'})
+
+    assert len(response.data) < compressing.COMPRESS_MIN_BYTES
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.json['status'] == 'healthy'
+
+
+def test_compression_disabled(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'COMPRESSION_ENABLED', False)
+    response = client.get('/forecast?location=London&days=3', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.json['location'] == 'London'
+
+
+def test_cached_response_is_not_compressed_twice(client, compressing):
+    headers = {'Accept-Encoding': 'gzip'}
+    for _ in range(3):  # first build, best-level upgrade, reuse
+        response = client.get('/forecast?location=London&days=3&format=stable', headers=headers)
+
+        assert response.headers.getlist('Content-Encoding') == ['gzip']
+        body = json.loads(gzip.decompress(response.data))
+        assert body['location'] == 'London'
+        assert len(body['forecast']) == 3
+
+
+def test_stable_body_is_reused(client):
+    first = client.get('/forecast?location=London&days=3&format=stable')
+    second = client.get('/forecast?location=London&days=3&format=stable')
+
+    assert first.data == second.data
+    assert set(first.json) == {'location', 'forecast', 'days', 'timestamp', 'source'}
+
+
+def test_body_cache_invalidated_when_data_changes(app_module):
+    cache = app_module.EncodedBodyCache(maxsize=4)
+    renders = []
+
+    def render(data):
+        def build():
+            renders.append(data)
+            return {'value': data}
+        return build
+
+    with app_module.app.app_context():
+        first, _ = cache.get('key', [1], render([1]), 'identity')
+        again, _ = cache.get('key', [1], render([1]), 'identity')
+        changed, _ = cache.get('key', [2], render([2]), 'identity')
+
+    assert first == again == b'{"value":[1]}'
+    assert changed == b'{"value":[2]}'
+    assert renders == [[1], [2]]
+
+
+def test_body_cache_evicts_least_recently_used(app_module):
+    cache = app_module.EncodedBodyCache(maxsize=2)
+    with app_module.app.app_context():
+        for key in ('a', 'b', 'c'):
+            cache.get(key, key, lambda: {}, 'identity')
+
+    assert list(cache._entries) == ['b', 'c']
+
+
+def test_compact_forecast_is_columnar_in_field_order(client, app_module):
+    response = client.get('/forecast?location=London&days=2&format=compact')
+
+    assert tuple(response.json['forecast']) == app_module.FORECAST_FIELDS
+    assert response.json == {
+        'location': 'London',
+        'days': 2,
+        'forecast': {
+            'day': ['Monday', 'Tuesday'],
+            'high': [62, 61],
+            'low': [52, 51],
+            'condition': ['Rainy', 'Cloudy'],
+        },
+    }
+
+
+def test_compact_field_selection(client):
+    response = client.get('/forecast?location=London&days=2&format=compact&fields=low,high')
+
+    assert list(response.json['forecast']) == ['high', 'low']
+
+
+def test_compact_current_missing_field_is_null(client):
+    response = client.get('/current?location=London&format=compact&fields=temperature,pressure')
+
+    assert response.json == {'location': 'London', 'current': {'temperature': 59, 'pressure': None}}
+
+
+@pytest.mark.parametrize('fields', ['bogus', 'high,bogus', ',', ''])
+def test_compact_invalid_fields_are_rejected(client, fields):
+    response = client.get(f'/forecast?location=London&format=compact&fields={fields}')
+
+    assert response.status_code == 400
+    assert 'Invalid fields parameter' in response.json['error']
@@ -0,0 +1,130 @@
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def limits(app_module, monkeypatch):
+    """
+    Install limiters: limits(global_limit, {'/current': 1}) -> (global, routes)
+    """
+    monkeypatch.setattr(app_module, 'QUEUE_TIMEOUT_MS', 0)
+
+    def install(global_limit=0, routes=None):
+        global_limiter = app_module.ConcurrencyLimiter('global', global_limit)
+        route_limiters = {
+            route: app_module.ConcurrencyLimiter(route, limit)
+            for route, limit in (routes or {}).items()
+        }
+        monkeypatch.setattr(app_module, 'global_limiter', global_limiter)
+        monkeypatch.setattr(app_module, 'route_limiters', route_limiters)
+        return global_limiter, route_limiters
+    return install
+
+
+def test_parse_route_limits(app_module):
+    assert app_module.parse_route_limits('forecast=8, /current=4,') == {'/forecast': 8, '/current': 4}
+    assert app_module.parse_route_limits('') == {}
+
+
+def test_limiter_sheds_after_timeout(app_module):
+    limiter = app_module.ConcurrencyLimiter('test', 1)
+    assert limiter.acquire(0)
+    assert not limiter.acquire(0.01)
+    assert limiter.shed == 1
+    assert limiter.queued == 0
+
+    limiter.release()
+    assert limiter.acquire(0)
+
+
+def test_limiter_waiter_gets_released_slot(app_module):
+    limiter = app_module.ConcurrencyLimiter('test', 1)
+    limiter.acquire(0)
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(limiter.acquire(5)))
+    waiter.start()
+    limiter.release()
+    waiter.join(5)
+    assert result == [True]
+    assert limiter.in_flight == 1
+
+
+def test_shed_returns_503_with_retry_after(client, app_module, limits, monkeypatch):
+    _, routes = limits(routes={'/current': 1})
+    started, unblock = threading.Event(), threading.Event()
+    original = app_module.get_mock_weather
+
+    def blocking_mock_weather(city):
+        started.set()
+        unblock.wait(5)
+        return original(city)
+
+    monkeypatch.setattr(app_module, 'get_mock_weather', blocking_mock_weather)
+    first = []
+    worker = threading.Thread(
+        target=lambda: first.append(app_module.app.test_client().get('/current?location=London'))
+    )
+    worker.start()
+    assert started.wait(5)
+
+    response = client.get('/current?location=London')
+    unblock.set()
+    worker.join(5)
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(app_module.SHED_RETRY_AFTER)
+    assert response.json['error'] == 'Service overloaded'
+    assert first[0].status_code == 200
+    assert routes['/current'].shed == 1
+    assert routes['/current'].in_flight == 0
+
+
+def test_global_slot_released_when_route_sheds(client, limits):
+    global_limiter, routes = limits(global_limit=10, routes={'/cities': 1})
+    routes['/cities'].acquire(0)
+
+    response = client.get('/cities')
+
+    assert response.status_code == 503
+    assert global_limiter.in_flight == 0
+    assert global_limiter.shed == 0
+    assert routes['/cities'].shed == 1
+
+
+@pytest.mark.parametrize('path', ['/health', '/ready', '/startup', '/metrics'])
+def test_probe_and_metrics_paths_are_exempt(client, limits, path):
+    global_limiter, _ = limits(global_limit=1)
+    global_limiter.acquire(0)
+
+    assert client.get(path).status_code == 200
+    assert global_limiter.shed == 0
+
+
+def test_in_flight_returns_to_zero_after_request(client, limits):
+    global_limiter, routes = limits(global_limit=5, routes={'/forecast': 2})
+
+    assert client.get('/forecast?location=London').status_code == 200
+    assert global_limiter.in_flight == 0
+    assert routes['/forecast'].in_flight == 0
+
+
+def test_in_flight_released_when_handler_fails(client, app_module, limits, monkeypatch):
+    global_limiter, _ = limits(global_limit=5)
+
+    def failing_mock_weather(city):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(app_module, 'get_mock_weather', failing_mock_weather)
+    assert client.get('/current?location=London').status_code == 500
+    assert global_limiter.in_flight == 0
+
+
+def test_metrics_reports_limiter_state(client, limits):
+    global_limiter, _ = limits(global_limit=3, routes={'/forecast': 2})
+    global_limiter.acquire(0)
+
+    body = client.get('/metrics').get_data(as_text=True)
+
+    assert 'weather_api_in_flight_requests{limiter="global"} 1' in body
+    assert 'weather_api_concurrency_limit{limiter="/forecast"} 2' in body
@@ -4,7 +4,9 @@ Validates Bearer tokens and generates IAM policies
 """
 import json
 import os
+import time
 import jwt
+from functools import wraps
 from jwt import PyJWKClient
 import logging
 
@@ -20,6 +22,32 @@ COGNITO_APP_CLIENT_ID = os.environ.get('COGNITO_APP_CLIENT_ID', '')
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key-change-in-production')
 TOKEN_ISSUER = os.environ.get('TOKEN_ISSUER', 'max-weather-api')
 
+# Per-invocation timing logs (disabled by default)
+TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'false').lower() == 'true'
+
+
+def traced(func):
+    """
+    Log the wall-clock duration of the wrapped function
+    
+    Returns the function unchanged when tracing is disabled, so there is
+    no overhead on the authorization path.
+    """
+    if not TRACING_ENABLED:
+        return func
+    
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            logger.info(f"Trace span={func.__name__} dur={duration_ms:.2f}ms")
+    return wrapper
+
+
+@traced
 def lambda_handler(event, context):
     """
     Lambda authorizer handler
@@ -84,6 +112,7 @@ def extract_token(event):
     return auth_header if auth_header else None
 
 
+@traced
 def validate_token(token):
     """
     Validate JWT token
@@ -116,6 +145,7 @@ def validate_token(token):
         raise
 
 
+@traced
 def validate_cognito_token(token):
     """
     Validate JWT token from AWS Cognito
@@ -146,6 +176,7 @@ def validate_cognito_token(token):
     return claims
 
 
+@traced
 def validate_simple_jwt(token):
     """
     Validate JWT token with shared secret (for testing/simple auth)
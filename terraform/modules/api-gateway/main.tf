@@ -44,6 +44,9 @@ resource "aws_api_gateway_rest_api" "main" {
   name        = "${var.project_name}-${var.environment}-api"
   description = "Weather API Gateway for ${var.project_name}"
 
+  # Pass gzip/br-encoded JSON from the backend through unchanged
+  binary_media_types = var.binary_media_types
+
   endpoint_configuration {
     types = ["REGIONAL"]
   }
@@ -30,6 +30,12 @@ variable "nlb_dns_name" {
   default     = "" # Empty = MOCK integration, set to NLB DNS after creation
 }
 
+variable "binary_media_types" {
+  description = "Media types passed through as binary (needed for compressed backend responses)"
+  type        = list(string)
+  default     = ["application/json"]
+}
+
 variable "tags" {
   description = "Tags to apply to resources"
   type        = map(string)